@@ -11,7 +11,6 @@ from twilio.rest import Client
 #------------------------------------#
 ACCOUNT_SID = os.environ["ACCOUNT_SID"]
 AUTH_TOKEN = os.environ["AUTH_TOKEN"]
-SEC_PIN = os.environ["SECURITY_PIN"]
 
 #------------------------------------#
 # OpenAI and Twilio Clients
@@ -22,7 +21,8 @@ CLIENT = Client(ACCOUNT_SID, AUTH_TOKEN)
 #------------------------------------#
 # Security check
 #------------------------------------#
-def process_incoming_message(PIN, incoming_message, send_to, send_from):
+def process_incoming_message(PIN, incoming_message, send_to, send_from,
+                             welcome_message=None, system_prompt=None, tools=None):
     """
     Generate a reply based on the incoming message.
     
@@ -32,6 +32,12 @@ def process_incoming_message(PIN, incoming_message, send_to, send_from):
         Security PIN
     incoming_message : str
         Incoming message from Twilio
+    welcome_message : str, optional
+        Overrides the default welcome text
+    system_prompt : str, optional
+        Overrides the default AI system prompt
+    tools : list, optional
+        Names of the tools the AI may call, defaults to all tools
     
     Returns
     -------
@@ -39,6 +45,8 @@ def process_incoming_message(PIN, incoming_message, send_to, send_from):
         Reply message
     """
     if incoming_message.strip() == PIN:
+        if welcome_message:
+            return welcome_message
         return """Welcome to the new Luis AI reminder assistant.
   - I can schedule calls and text reminders for you.
   - I can also just answer questions.
@@ -47,12 +55,15 @@ def process_incoming_message(PIN, incoming_message, send_to, send_from):
         messages = CLIENT.messages.list(from_=send_to, to=send_from)
         sent_pin = False
         for message in messages:
-            if message.body.strip() == PIN:
+            if message.body.strip().lower() == PIN:
                 sent_pin = True
         if sent_pin:
             follow_up_reply = get_follow_up_text(send_to=send_to,
                                     send_from=send_from,
-                                    incoming_message=incoming_message)
+                                    incoming_message=incoming_message,
+                                    welcome_message=welcome_message,
+                                    system_prompt=system_prompt,
+                                    tools=tools)
             return follow_up_reply
         else:
             return f"Please provide security PIN to continue."
@@ -149,7 +160,8 @@ def schedule_reminder(natural_language_request, number_from):
 #------------------------------------#
 # Follow up text
 #------------------------------------#
-def get_follow_up_text(send_to, send_from, incoming_message):
+def get_follow_up_text(send_to, send_from, incoming_message,
+                       welcome_message=None, system_prompt=None, tools=None):
     """Send follow up text
     
     Parameters
@@ -160,6 +172,12 @@ def get_follow_up_text(send_to, send_from, incoming_message):
         Phone number to send text from
     incoming_message : str
         Incoming message from Twilio
+    welcome_message : str, optional
+        Overrides the default welcome text
+    system_prompt : str, optional
+        Overrides the default AI system prompt
+    tools : list, optional
+        Names of the tools the AI may call, defaults to all tools
         
     Returns
     -------
@@ -167,12 +185,14 @@ def get_follow_up_text(send_to, send_from, incoming_message):
         Response from the AI to the user
     """
     if incoming_message == 'about':
+        if welcome_message:
+            return welcome_message
         return """Welcome to the new Luis AI reminder assistant.
     - I can schedule calls and text reminders for you.
     - I can answer any questions, within reason.
     - Text 'about' to see this message again"""
     else:
-        tools = [
+        available_tools = [
                     {
                         "type": "function",
                         "function": {
@@ -191,17 +211,21 @@ def get_follow_up_text(send_to, send_from, incoming_message):
                         }
                     }
                 ]
+        if tools is not None:
+            available_tools = [t for t in available_tools if t["function"]["name"] in tools]
+        if system_prompt is None:
+            system_prompt = "You are an AI assistant that can schedule reminders (like calls and texts) if asked to do so. Be informative, funny, and helpful, and keep your messages clear and short. To schedule reminder just pass a natural language request to the function 'schedule_reminder'"
         #----------------------------------------------------#
         # AI w/tools - reply or use tools to schedule reminder
         #----------------------------------------------------#
+        tool_kwargs = {"tools": available_tools, "tool_choice": "auto"} if available_tools else {}
         completion = ai_client.chat.completions.create(
             model="gpt-3.5-turbo-1106",
             messages=[
-                {"role": "system", "content": f"You are an AI assistant that can schedule reminders (like calls and texts) if asked to do so. Be informative, funny, and helpful, and keep your messages clear and short. To schedule reminder just pass a natural language request to the function 'schedule_reminder'"},
+                {"role": "system", "content": f"{system_prompt}"},
                 {"role": "user", "content": f"{incoming_message}"}
             ],
-            tools=tools,
-            tool_choice="auto"
+            **tool_kwargs
         )
         message = completion.choices[0].message.content
         if message==None:
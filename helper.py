@@ -21,7 +21,8 @@ CLIENT = Client(ACCOUNT_SID, AUTH_TOKEN)
 #------------------------------------#
 # Security check
 #------------------------------------#
-def process_incoming_message(PIN, send_to, send_from, incoming_message):
+def process_incoming_message(PIN, send_to, send_from, incoming_message,
+                             welcome_message=None, system_prompt=None, tools=None):
     """
     Process incoming message & generate a reply.
     
@@ -35,28 +36,40 @@ def process_incoming_message(PIN, send_to, send_from, incoming_message):
         Phone number to send text from
     incoming_message : str
         Incoming message from Twilio
+    welcome_message : str, optional
+        Overrides the default welcome text
+    system_prompt : str, optional
+        Overrides the default AI system prompt
+    tools : list, optional
+        Names of the tools the AI may call, defaults to all tools
     
     Returns
     -------
     Send message using Twilio
     """
     if incoming_message.strip() == PIN:
-        send_initial_text(send_to, send_from)
+        send_initial_text(send_to, send_from, welcome_message)
     else:
         messages = CLIENT.messages.list(from_=send_to, to=send_from)
         sent_pin = False
         for message in messages:
-            if message.body.strip() == PIN:
+            if message.body.strip().lower() == PIN:
                 sent_pin = True
         if sent_pin:
-            send_follow_up_text(send_to, send_from, incoming_message)
+            send_follow_up_text(send_to, send_from, incoming_message,
+                                welcome_message=welcome_message,
+                                system_prompt=system_prompt,
+                                tools=tools)
         else:
             send_message("Please provide security PIN to continue", send_to, send_from)
 
 #------------------------------------#
 # Welcome text
 #------------------------------------#
-def send_initial_text(send_to, send_from):
+def send_initial_text(send_to, send_from, welcome_message=None):
+    if welcome_message:
+        send_message(welcome_message, send_to, send_from)
+        return
     outgoing_message = f"""Welcome to Hess Services new AI assistant.
         - I can schedule calls and text reminders for you.
         - I can answer any questions, within reason.
@@ -134,7 +147,8 @@ def schedule_reminder(natural_language_request, number_from):
 #------------------------------------#
 # Follow up text
 #------------------------------------#
-def send_follow_up_text(send_to, send_from, incoming_message):
+def send_follow_up_text(send_to, send_from, incoming_message,
+                        welcome_message=None, system_prompt=None, tools=None):
     """Send follow up text
     
     Parameters
@@ -145,11 +159,17 @@ def send_follow_up_text(send_to, send_from, incoming_message):
         Phone number to send text from
     incoming_message : str
         Incoming message from Twilio
+    welcome_message : str, optional
+        Overrides the default welcome text
+    system_prompt : str, optional
+        Overrides the default AI system prompt
+    tools : list, optional
+        Names of the tools the AI may call, defaults to all tools
     """
     if incoming_message == 'hess':
-        send_initial_text(send_to, send_from)
+        send_initial_text(send_to, send_from, welcome_message)
     else:
-        tools = [
+        available_tools = [
                     {
                         "type": "function",
                         "function": {
@@ -172,17 +192,21 @@ def send_follow_up_text(send_to, send_from, incoming_message):
                         }
                     }
                 ]
+        if tools is not None:
+            available_tools = [t for t in available_tools if t["function"]["name"] in tools]
+        if system_prompt is None:
+            system_prompt = "You are an AI assistant that can schedule reminders (like calls and texts) if asked to do so. Be informative, funny, and helpful, and keep your messages clear and short. To schedule reminder just pass a natural language request to the function 'schedule_reminder'"
         #----------------------------------------------------#
         # AI w/tools - reply or use tools to schedule reminder
         #----------------------------------------------------#
+        tool_kwargs = {"tools": available_tools, "tool_choice": "auto"} if available_tools else {}
         completion = ai_client.chat.completions.create(
             model="gpt-3.5-turbo-1106",
             messages=[
-                {"role": "system", "content": f"You are an AI assistant that can schedule reminders (like calls and texts) if asked to do so. Be informative, funny, and helpful, and keep your messages clear and short. To schedule reminder just pass a natural language request to the function 'schedule_reminder'"},
+                {"role": "system", "content": f"{system_prompt}"},
                 {"role": "user", "content": f"{incoming_message}"}
             ],
-            tools=tools,
-            tool_choice="auto"
+            **tool_kwargs
         )
         message = completion.choices[0].message.content
         if message==None:
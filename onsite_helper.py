@@ -13,7 +13,6 @@ from twilio.rest import Client
 #------------------------------------#
 ACCOUNT_SID = os.environ["ACCOUNT_SID"]
 AUTH_TOKEN = os.environ["AUTH_TOKEN"]
-SEC_PIN = os.environ["SECURITY_PIN"]
 
 #------------------------------------#
 # Twilio Client
@@ -24,11 +23,12 @@ CLIENT = Client(ACCOUNT_SID, AUTH_TOKEN)
 # Initialize SQS client
 #------------------------------------#
 sqs = boto3.client('sqs')
-queue_url = os.environ["AMAZON_QUEUE_ENDPOINT"]
+queue_url = os.environ.get("AMAZON_QUEUE_ENDPOINT")
 
-def save_sms_to_sqs(sender, message, date_sent=None):
+def save_sms_to_sqs(sender, message, date_sent=None, queue_endpoint=None):
     """
     Save SMS message details into SQS queue.
+    Uses `queue_endpoint` if given, otherwise AMAZON_QUEUE_ENDPOINT.
     """
     try:
         message_body = {
@@ -37,7 +37,7 @@ def save_sms_to_sqs(sender, message, date_sent=None):
             'date_sent': date_sent if date_sent else datetime.utcnow().isoformat()
         }
         response = sqs.send_message(
-            QueueUrl=queue_url,
+            QueueUrl=queue_endpoint or queue_url,
             MessageBody=json.dumps(message_body)
         )
         return f"Message from {sender} saved successfully."
@@ -48,7 +48,8 @@ def save_sms_to_sqs(sender, message, date_sent=None):
 #------------------------------------#
 # Security check
 #------------------------------------#
-def process_incoming_message(PIN, incoming_message, send_to, send_from, image_urls, audio_urls):
+def process_incoming_message(PIN, incoming_message, send_to, send_from, image_urls, audio_urls,
+                             welcome_message=None, queue_endpoint=None):
     """
     Generate a reply based on the incoming message.
     
@@ -66,6 +67,10 @@ def process_incoming_message(PIN, incoming_message, send_to, send_from, image_ur
         A list of twilio media urls for images, to be processed using vision AI
     audio_urls : list
         A list of audio media urls for audio, to be transcribed & processed as text on-site
+    welcome_message : str, optional
+        Overrides the default welcome text
+    queue_endpoint : str, optional
+        SQS queue for this number, defaults to AMAZON_QUEUE_ENDPOINT
     
     Returns
     -------
@@ -73,6 +78,8 @@ def process_incoming_message(PIN, incoming_message, send_to, send_from, image_ur
         Reply message
     """
     if incoming_message.strip() == PIN:
+        if welcome_message:
+            return welcome_message
         return """Welcome to the new internal Hess Services SMS AI service.
   - I can lookup general information about jobs, parts, parts where used, inventory on hand, serial numbers, etc.
   - I can also email you.
@@ -81,14 +88,16 @@ def process_incoming_message(PIN, incoming_message, send_to, send_from, image_ur
         messages = CLIENT.messages.list(from_=send_to, to=send_from)
         sent_pin = False
         for message in messages:
-            if message.body.strip() == PIN:
+            if message.body.strip().lower() == PIN:
                 sent_pin = True
         if sent_pin:
             follow_up_reply = get_follow_up_text(send_to=send_to,
                                     send_from=send_from,
                                     incoming_message=incoming_message,
                                     image_urls=image_urls,
-                                    audio_urls=audio_urls)
+                                    audio_urls=audio_urls,
+                                    welcome_message=welcome_message,
+                                    queue_endpoint=queue_endpoint)
             return follow_up_reply
         else:
             return f"Please provide security PIN to continue."
@@ -96,7 +105,8 @@ def process_incoming_message(PIN, incoming_message, send_to, send_from, image_ur
 #------------------------------------#
 # Follow up text
 #------------------------------------#
-def get_follow_up_text(send_to, send_from, incoming_message, image_urls, audio_urls):
+def get_follow_up_text(send_to, send_from, incoming_message, image_urls, audio_urls,
+                       welcome_message=None, queue_endpoint=None):
     """Send follow up text
     
     Parameters
@@ -111,6 +121,10 @@ def get_follow_up_text(send_to, send_from, incoming_message, image_urls, audio_u
         list of image urls
     audio_urls : list
         list of audio urls
+    welcome_message : str, optional
+        Overrides the default welcome text
+    queue_endpoint : str, optional
+        SQS queue for this number, defaults to AMAZON_QUEUE_ENDPOINT
         
     Returns
     -------
@@ -118,6 +132,8 @@ def get_follow_up_text(send_to, send_from, incoming_message, image_urls, audio_u
         Response from the AI to the user
     """
     if incoming_message == 'about':
+        if welcome_message:
+            return welcome_message
         return """Welcome to the new internal Hess Services SMS AI service.
   - I can lookup general information about jobs, parts, parts where used, inventory on hand, serial numbers, etc.
   - I can also email you.
@@ -126,6 +142,6 @@ def get_follow_up_text(send_to, send_from, incoming_message, image_urls, audio_u
         # Message to save is then processed on site & contents of lists
         # are extracted using regex (extracting contents of first set of [] and second set of []
         message_to_save = f"{image_urls} {audio_urls} {incoming_message}"
-        result = save_sms_to_sqs(send_to, message_to_save)
+        result = save_sms_to_sqs(send_to, message_to_save, queue_endpoint=queue_endpoint)
         # Receive incoming messages without sending a reply
         return ''
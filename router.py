@@ -0,0 +1,244 @@
+import os
+import json
+import time
+import logging
+import importlib
+import threading
+from collections import deque
+
+#------------------------------------#
+# Backends & the settings they accept
+#------------------------------------#
+# Every route may also set 'pin' and 'rate_limit'. Anything else a route
+# sets is passed straight to the backend's process_incoming_message.
+BACKENDS = {
+    "helper": {"welcome_message", "system_prompt", "tools"},
+    "alternative_helper": {"welcome_message", "system_prompt", "tools"},
+    "onsite_helper": {"welcome_message", "queue_endpoint"},
+}
+TOOLS = {"schedule_reminder"}
+DEFAULT_ROUTE = "*"
+
+#------------------------------------#
+# Load & validate routing table
+#------------------------------------#
+def load_routes(raw_routes=None):
+    """
+    Build the routing table, keyed by the Twilio number a message was sent to.
+
+    Routes come from the SMS_ROUTES environment variable, a JSON object like
+    {"+15554443333": {"backend": "alternative_helper", "pin": "1234"}}.
+    Use "*" as the number for a catch-all route. If SMS_ROUTES is not set,
+    a single catch-all route is built from SMS_BACKEND (default
+    'onsite_helper') and SECURITY_PIN.
+
+    Only the backends used by at least one route are imported.
+
+    Parameters
+    ----------
+    raw_routes : str, optional
+        JSON routing table, defaults to SMS_ROUTES
+
+    Returns
+    -------
+    routes : dict
+        Twilio number -> route, each route holding its 'backend' name, the
+        imported 'module', 'pin', 'rate_limit' and backend 'settings'
+    """
+    routes = parse_routes(raw_routes)
+    modules = {}
+    for number, route in routes.items():
+        backend = route["backend"]
+        if backend not in modules:
+            modules[backend] = importlib.import_module(f"__app__.{backend}")
+        route["module"] = modules[backend]
+        logging.info(f"Routing {number} to {backend}")
+    return routes
+
+def parse_routes(raw_routes=None):
+    """
+    Parse & validate the routing table without importing any backend.
+
+    Parameters
+    ----------
+    raw_routes : str, optional
+        JSON routing table, defaults to SMS_ROUTES
+
+    Returns
+    -------
+    routes : dict
+        Twilio number -> validated route (see validate_route)
+    """
+    if raw_routes is None:
+        raw_routes = os.environ.get("SMS_ROUTES")
+    if raw_routes:
+        try:
+            config = json.loads(raw_routes)
+        except ValueError as e:
+            raise ValueError(f"SMS_ROUTES is not valid JSON. {e}")
+        if not isinstance(config, dict) or not config:
+            raise ValueError("SMS_ROUTES must be a non-empty JSON object keyed by phone number.")
+    else:
+        config = {DEFAULT_ROUTE: {"backend": os.environ.get("SMS_BACKEND", "onsite_helper")}}
+
+    return {number: validate_route(number, route_config)
+            for number, route_config in config.items()}
+
+def validate_route(number, route_config):
+    """
+    Check a single route and fill in defaults.
+
+    Parameters
+    ----------
+    number : str
+        Twilio number in E.164 format (e.g. '+15554443333') or '*'
+    route_config : dict
+        Route settings from the routing table
+
+    Returns
+    -------
+    route : dict
+        Validated route with 'backend', 'pin', 'rate_limit' and 'settings'
+    """
+    if number != DEFAULT_ROUTE and not (number.startswith("+") and number[1:].isdigit()):
+        raise ValueError(f"Route number '{number}' must be in E.164 format, e.g. '+15554443333'.")
+    if not isinstance(route_config, dict):
+        raise ValueError(f"Route for {number} must be a JSON object.")
+
+    settings = dict(route_config)
+    backend = settings.pop("backend", None)
+    if not isinstance(backend, str) or backend not in BACKENDS:
+        raise ValueError(f"Route for {number} has unknown backend '{backend}'. Choose from {sorted(BACKENDS)}.")
+
+    pin = settings.pop("pin", None) or os.environ.get("SECURITY_PIN")
+    if not pin:
+        raise ValueError(f"Route for {number} needs a 'pin' (or set SECURITY_PIN).")
+    if not isinstance(pin, str) or not pin.strip():
+        raise ValueError(f"Route for {number} needs 'pin' to be a non-empty string.")
+    # Incoming messages are stripped & lowercased before comparing to the PIN
+    pin = pin.strip().lower()
+
+    rate_limit = settings.pop("rate_limit", None)
+    if rate_limit is not None:
+        messages = rate_limit.get("messages") if isinstance(rate_limit, dict) else None
+        seconds = rate_limit.get("seconds") if isinstance(rate_limit, dict) else None
+        valid_messages = isinstance(messages, int) and not isinstance(messages, bool) and messages > 0
+        valid_seconds = isinstance(seconds, (int, float)) and not isinstance(seconds, bool) and seconds > 0
+        if not (valid_messages and valid_seconds):
+            raise ValueError(f"Route for {number} needs rate_limit like {{\"messages\": 10, \"seconds\": 60}}.")
+
+    unknown = set(settings) - BACKENDS[backend]
+    if unknown:
+        raise ValueError(f"Route for {number} has settings {sorted(unknown)} not supported by {backend}.")
+    for key in ("welcome_message", "system_prompt", "queue_endpoint"):
+        if key in settings and not isinstance(settings[key], str):
+            raise ValueError(f"Route for {number} needs '{key}' to be a string.")
+    if "tools" in settings:
+        tools = settings["tools"]
+        if (not isinstance(tools, list) or not all(isinstance(t, str) for t in tools)
+                or not set(tools) <= TOOLS):
+            raise ValueError(f"Route for {number} has tools {settings['tools']}, available tools are {sorted(TOOLS)}.")
+    if backend == "onsite_helper" and not (settings.get("queue_endpoint") or os.environ.get("AMAZON_QUEUE_ENDPOINT")):
+        raise ValueError(f"Route for {number} needs a 'queue_endpoint' (or set AMAZON_QUEUE_ENDPOINT).")
+
+    return {
+        "backend": backend,
+        "pin": pin,
+        "rate_limit": rate_limit,
+        "settings": settings,
+    }
+
+#------------------------------------#
+# Lookup
+#------------------------------------#
+def get_route(routes, send_from):
+    """
+    Find the route for the Twilio number a message was sent to.
+
+    Parameters
+    ----------
+    routes : dict
+        Routing table from load_routes
+    send_from : str
+        Twilio number (the 'To' of the incoming request)
+
+    Returns
+    -------
+    route : dict or None
+        Matching route, the catch-all route, or None
+    """
+    route = routes.get(send_from)
+    if route is None:
+        route = routes.get(DEFAULT_ROUTE)
+    return route
+
+#------------------------------------#
+# Rate limiting
+#------------------------------------#
+# Recent message times per (Twilio number, sender). This lives in the
+# worker's memory, so limits apply per worker rather than per deployment.
+# Senders with no messages left in their window are swept out every
+# PRUNE_INTERVAL seconds so a warm worker does not grow without bound.
+# Requests run on a thread pool, so all access goes through _rate_limit_lock.
+_recent_messages = {}
+_last_prune = 0.0
+_rate_limit_lock = threading.Lock()
+PRUNE_INTERVAL = 300
+
+def is_rate_limited(route, send_to, send_from):
+    """
+    Record an incoming message and check it against the route's rate limit.
+
+    Parameters
+    ----------
+    route : dict
+        Route from get_route
+    send_to : str
+        Phone number of the person texting
+    send_from : str
+        Twilio number
+
+    Returns
+    -------
+    bool
+        True if the sender went over the limit
+    """
+    rate_limit = route["rate_limit"]
+    if rate_limit is None:
+        return False
+    seconds = rate_limit["seconds"]
+    with _rate_limit_lock:
+        now = time.monotonic()
+        prune_recent_messages(now)
+        recent, _ = _recent_messages.setdefault((send_from, send_to), (deque(), seconds))
+        while recent and now - recent[0] > seconds:
+            recent.popleft()
+        if len(recent) >= rate_limit["messages"]:
+            return True
+        recent.append(now)
+        return False
+
+def prune_recent_messages(now):
+    """
+    Forget senders whose messages have all left their rate limit window.
+    Callers must hold _rate_limit_lock.
+
+    Parameters
+    ----------
+    now : float
+        Current time.monotonic()
+    """
+    global _last_prune
+    if now - _last_prune < PRUNE_INTERVAL:
+        return
+    _last_prune = now
+    for key, (recent, seconds) in list(_recent_messages.items()):
+        if not recent or now - recent[-1] > seconds:
+            del _recent_messages[key]
+
+#------------------------------------#
+# Check SMS_ROUTES before deploying
+#------------------------------------#
+if __name__ == "__main__":
+    for number, route in parse_routes().items():
+        print(f"{number} -> {route['backend']}")
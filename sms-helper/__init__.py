@@ -2,9 +2,7 @@ import os
 import logging
 import sentry_sdk
 import azure.functions as func
-# import __app__.helper as helper
-# import __app__.alternative_helper as alternative_helper
-import __app__.onsite_helper as onsite_helper
+import __app__.router as router
 from sentry_sdk.integrations.serverless import serverless_function
 
 #------------------------------------#
@@ -17,6 +15,13 @@ sentry_sdk.init(
     traces_sample_rate=1.0,
 )
 
+#------------------------------------#
+# Routing table
+#------------------------------------#
+# Loaded once per worker. Each Twilio number maps to one of helper.py,
+# alternative_helper.py or onsite_helper.py (see router.py & SMS_ROUTES).
+ROUTES = router.load_routes()
+
 #------------------------------------#
 # Main function
 #------------------------------------#
@@ -27,60 +32,75 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
     send_from = req.params["To"]
     incoming_message = req.params.get("Body", "").lower().strip()
 
+    route = router.get_route(ROUTES, send_from)
+    if route is None:
+        logging.warning(f"No route configured for {send_from}")
+        return func.HttpResponse("", status_code=404)
+    if router.is_rate_limited(route, send_to, send_from):
+        # Empty body so Twilio sends no reply, each reply costs a message
+        return func.HttpResponse("", status_code=200)
+
+    backend = route["backend"]
+    module = route["module"]
+    pin = route["pin"]
+    settings = route["settings"]
 
     #--------------------------------------------------------------------------#
-    # Uncomment for use with onsite_helper.py
+    # onsite_helper.py
     # This saves messages to AWS database, and then the messages are
     # processed internally at HSI. This way we can reply with internal
     # info + use local AI models + secure databases.
     #--------------------------------------------------------------------------#
-    # Extracting media URLs from Twilio request
-    num_media = int(req.params.get("NumMedia", 0))
-    image_urls = []
-    audio_urls = []
+    if backend == "onsite_helper":
+        # Extracting media URLs from Twilio request
+        num_media = int(req.params.get("NumMedia", 0))
+        image_urls = []
+        audio_urls = []
 
-    for i in range(num_media):
-        media_content_type = req.params.get(f"MediaContentType{i}")
-        media_url = req.params.get(f"MediaUrl{i}")
-        
-        if media_content_type and media_url:
-            if media_content_type.startswith("image/"):
-                image_urls.append(media_url)
-            elif media_content_type.startswith("audio/"):
-                audio_urls.append(media_url)
-
-    pin = onsite_helper.SEC_PIN
-    res = onsite_helper.process_incoming_message(
-                PIN=pin,
-                incoming_message=incoming_message,
-                send_to=send_to,
-                send_from=send_from,
-                image_urls=image_urls,
-                audio_urls=audio_urls
-        )
-    return func.HttpResponse(res, status_code=200)
+        for i in range(num_media):
+            media_content_type = req.params.get(f"MediaContentType{i}")
+            media_url = req.params.get(f"MediaUrl{i}")
+            
+            if media_content_type and media_url:
+                if media_content_type.startswith("image/"):
+                    image_urls.append(media_url)
+                elif media_content_type.startswith("audio/"):
+                    audio_urls.append(media_url)
 
+        res = module.process_incoming_message(
+                    PIN=pin,
+                    incoming_message=incoming_message,
+                    send_to=send_to,
+                    send_from=send_from,
+                    image_urls=image_urls,
+                    audio_urls=audio_urls,
+                    **settings
+            )
+        return func.HttpResponse(res, status_code=200)
 
     #--------------------------------------------------------------------------#
-    # Uncomment for use with helper.py
+    # helper.py
+    # Sends replies through Twilio directly.
     #--------------------------------------------------------------------------#
-    # helper.process_incoming_message(os.environ["SECURITY_PIN"], 
-    #                                     send_to, 
-    #                                     send_from, 
-    #                                     incoming_message)
+    if backend == "helper":
+        module.process_incoming_message(pin, 
+                                        send_to, 
+                                        send_from, 
+                                        incoming_message,
+                                        **settings)
 
-    # return func.HttpResponse(
-    #     "You can text this number again if you need more information. (LPM)", status_code=200
-    # )
+        return func.HttpResponse(
+            "You can text this number again if you need more information. (LPM)", status_code=200
+        )
     
     #--------------------------------------------------------------------------#
-    # Uncomment for use with alternative_helper.py
+    # alternative_helper.py
     # Reduces the number of messages send, returns the response message 
     # as the HttpResponse. 
     #--------------------------------------------------------------------------#
-    # pin = alternative_helper.SEC_PIN
-    # res = alternative_helper.process_incoming_message(PIN=pin,
-    #             incoming_message=incoming_message,
-    #             send_to=send_to,
-    #             send_from=send_from)
-    # return func.HttpResponse(res, status_code=200)
\ No newline at end of file
+    res = module.process_incoming_message(PIN=pin,
+                incoming_message=incoming_message,
+                send_to=send_to,
+                send_from=send_from,
+                **settings)
+    return func.HttpResponse(res, status_code=200)
@@ -0,0 +1,43 @@
+import os
+import sys
+import types
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_NAMES = ("helper", "alternative_helper", "onsite_helper")
+
+# Stub backend: records every call & replies with its own name
+STUB_BACKEND = '''NAME = "{name}"
+CALLS = []
+
+def process_incoming_message(*args, **kwargs):
+    CALLS.append((args, kwargs))
+    return f"reply from {{NAME}}"
+'''
+
+#------------------------------------#
+# Fixtures
+#------------------------------------#
+@pytest.fixture
+def app_package(tmp_path, monkeypatch):
+    """
+    Fake the __app__ package Azure Functions provides, with stub backend
+    modules in front of the real ones so no Twilio/OpenAI/AWS clients are
+    created. Modules imported under __app__ are dropped afterwards.
+    """
+    for name in BACKEND_NAMES:
+        (tmp_path / f"{name}.py").write_text(STUB_BACKEND.format(name=name))
+    app = types.ModuleType("__app__")
+    app.__path__ = [str(tmp_path), REPO_ROOT]
+    monkeypatch.setitem(sys.modules, "__app__", app)
+    for name in ("SMS_ROUTES", "SMS_BACKEND", "SECURITY_PIN", "AMAZON_QUEUE_ENDPOINT"):
+        monkeypatch.delenv(name, raising=False)
+    yield app
+    for name in list(sys.modules):
+        if name.startswith("__app__."):
+            del sys.modules[name]
+
+@pytest.fixture
+def router(app_package):
+    import __app__.router as router
+    return router
@@ -0,0 +1,157 @@
+import os
+import ast
+import sys
+import types
+import importlib.util
+import pytest
+from conftest import REPO_ROOT, BACKEND_NAMES
+
+#------------------------------------#
+# Route settings match the backends
+#------------------------------------#
+def optional_params(name, function="process_incoming_message"):
+    """Names of the parameters with defaults, read from the source with ast."""
+    with open(os.path.join(REPO_ROOT, f"{name}.py")) as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name == function:
+            args = node.args.args
+            return {arg.arg for arg in args[len(args) - len(node.args.defaults):]}
+    raise AssertionError(f"{name}.py has no {function}")
+
+@pytest.mark.parametrize("name", BACKEND_NAMES)
+def test_backend_settings_match_signature(router, name):
+    assert router.BACKENDS[name] == optional_params(name)
+
+#------------------------------------#
+# Fixtures
+#------------------------------------#
+class Completions:
+    def __init__(self):
+        self.calls = []
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        message = types.SimpleNamespace(content="hi there", tool_calls=None)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+class Queue:
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, **kwargs):
+        self.sent.append(kwargs)
+
+class Messages:
+    def __init__(self):
+        self.history = []
+        self.sent = []
+
+    def list(self, **kwargs):
+        return [types.SimpleNamespace(body=body) for body in self.history]
+
+    def create(self, **kwargs):
+        self.sent.append(kwargs)
+
+@pytest.fixture
+def load_backend(monkeypatch):
+    """
+    Import a real backend module against stub openai, twilio, requests, boto3
+    and azure.functions modules. Returns the module, its OpenAI completions
+    and its Twilio messages. The SQS client is the fixture's `queue`.
+    """
+    completions = Completions()
+    messages = Messages()
+    queue = Queue()
+    boto3 = types.ModuleType("boto3")
+    boto3.client = lambda name: queue
+    openai = types.ModuleType("openai")
+    openai.OpenAI = lambda: types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions))
+    twilio = types.ModuleType("twilio")
+    rest = types.ModuleType("twilio.rest")
+    rest.Client = lambda sid, token: types.SimpleNamespace(messages=messages)
+    azure = types.ModuleType("azure")
+    functions = types.ModuleType("azure.functions")
+    functions.HttpResponse = lambda *args, **kwargs: None
+    for name, module in [("openai", openai), ("twilio", twilio), ("twilio.rest", rest),
+                         ("requests", types.ModuleType("requests")), ("boto3", boto3),
+                         ("azure", azure), ("azure.functions", functions)]:
+        monkeypatch.setitem(sys.modules, name, module)
+    monkeypatch.setenv("ACCOUNT_SID", "sid")
+    monkeypatch.setenv("AUTH_TOKEN", "token")
+
+    def load(name):
+        spec = importlib.util.spec_from_file_location(f"backend_{name}", os.path.join(REPO_ROOT, f"{name}.py"))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module, completions, messages
+    load.queue = queue
+    return load
+
+#------------------------------------#
+# alternative_helper.py
+#------------------------------------#
+def test_alternative_helper_default_tools(load_backend):
+    backend, completions, _ = load_backend("alternative_helper")
+    assert backend.get_follow_up_text("+15551230000", "+15550001111", "hello") == "hi there"
+    call = completions.calls[0]
+    assert [t["function"]["name"] for t in call["tools"]] == ["schedule_reminder"]
+    assert call["tool_choice"] == "auto"
+
+def test_alternative_helper_no_tools(load_backend):
+    backend, completions, _ = load_backend("alternative_helper")
+    backend.get_follow_up_text("+15551230000", "+15550001111", "hello",
+                               system_prompt="Be brief.", tools=[])
+    call = completions.calls[0]
+    assert "tools" not in call and "tool_choice" not in call
+    assert call["messages"][0] == {"role": "system", "content": "Be brief."}
+
+def test_alternative_helper_welcome_message(load_backend):
+    backend, _, _ = load_backend("alternative_helper")
+    assert backend.process_incoming_message("1234", "1234", "+15551230000", "+15550001111",
+                                            welcome_message="Hi!") == "Hi!"
+    assert backend.get_follow_up_text("+15551230000", "+15550001111", "about",
+                                      welcome_message="Hi!") == "Hi!"
+
+def test_alternative_helper_pin_history_ignores_case(load_backend):
+    backend, _, messages = load_backend("alternative_helper")
+    messages.history = ["AbC "]
+    assert backend.process_incoming_message("abc", "hello", "+15551230000", "+15550001111") == "hi there"
+    messages.history = ["nope"]
+    assert backend.process_incoming_message("abc", "hello", "+15551230000", "+15550001111") \
+        == "Please provide security PIN to continue."
+
+#------------------------------------#
+# helper.py
+#------------------------------------#
+def test_helper_no_tools(load_backend):
+    backend, completions, messages = load_backend("helper")
+    backend.send_follow_up_text("+15551230000", "+15550001111", "hello",
+                                system_prompt="Be brief.", tools=[])
+    call = completions.calls[0]
+    assert "tools" not in call and "tool_choice" not in call
+    assert call["messages"][0] == {"role": "system", "content": "Be brief."}
+    assert messages.sent[0]["body"] == "hi there"
+
+def test_helper_welcome_message(load_backend):
+    backend, _, messages = load_backend("helper")
+    backend.process_incoming_message("1234", "+15551230000", "+15550001111", "1234",
+                                     welcome_message="Hi!")
+    assert messages.sent == [{"body": "Hi!", "from_": "+15550001111", "to": "+15551230000"}]
+
+#------------------------------------#
+# onsite_helper.py
+#------------------------------------#
+def test_onsite_helper_queue_endpoint(load_backend, monkeypatch):
+    monkeypatch.setenv("AMAZON_QUEUE_ENDPOINT", "https://default-sqs")
+    backend, _, messages = load_backend("onsite_helper")
+    messages.history = ["5678"]
+    assert backend.process_incoming_message("5678", "hello", "+15551230000", "+15550002222",
+                                            [], [], queue_endpoint="https://sqs") == ""
+    backend.process_incoming_message("5678", "hello", "+15551230000", "+15550002222", [], [])
+    assert [m["QueueUrl"] for m in load_backend.queue.sent] == ["https://sqs", "https://default-sqs"]
+
+def test_onsite_helper_welcome_message(load_backend):
+    backend, _, _ = load_backend("onsite_helper")
+    assert backend.process_incoming_message("5678", "5678", "+15551230000", "+15550002222",
+                                            [], [], welcome_message="Hi!") == "Hi!"
@@ -0,0 +1,114 @@
+import os
+import sys
+import json
+import types
+import importlib.util
+import pytest
+from conftest import REPO_ROOT
+
+#------------------------------------#
+# Fixtures
+#------------------------------------#
+class HttpResponse:
+    def __init__(self, body=None, status_code=200):
+        self.body = body
+        self.status_code = status_code
+
+@pytest.fixture
+def load_main(app_package, monkeypatch):
+    """
+    Import sms-helper/__init__.py against stub azure.functions, sentry_sdk
+    and backend modules, with SMS_ROUTES set to the given routes.
+    """
+    azure = types.ModuleType("azure")
+    functions = types.ModuleType("azure.functions")
+    functions.HttpRequest = object
+    functions.HttpResponse = HttpResponse
+    azure.functions = functions
+    sentry_sdk = types.ModuleType("sentry_sdk")
+    sentry_sdk.init = lambda **kwargs: None
+    integrations = types.ModuleType("sentry_sdk.integrations")
+    serverless = types.ModuleType("sentry_sdk.integrations.serverless")
+    serverless.serverless_function = lambda f: f
+    for name, module in [("azure", azure), ("azure.functions", functions),
+                         ("sentry_sdk", sentry_sdk), ("sentry_sdk.integrations", integrations),
+                         ("sentry_sdk.integrations.serverless", serverless)]:
+        monkeypatch.setitem(sys.modules, name, module)
+    monkeypatch.setenv("SENTRY_DSN", "")
+
+    def load(routes):
+        monkeypatch.setenv("SMS_ROUTES", json.dumps(routes))
+        path = os.path.join(REPO_ROOT, "sms-helper", "__init__.py")
+        spec = importlib.util.spec_from_file_location("__app__.sms_helper", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    return load
+
+def request(to, body="hello", **params):
+    return types.SimpleNamespace(params={"From": "+15551230000", "To": to, "Body": body, **params})
+
+ROUTES = {
+    "+15550001111": {"backend": "alternative_helper", "pin": "1234", "system_prompt": "Be brief."},
+    "+15550002222": {"backend": "onsite_helper", "pin": "5678", "queue_endpoint": "https://sqs"},
+    "+15550003333": {"backend": "helper", "pin": "abcd", "tools": [],
+                     "rate_limit": {"messages": 1, "seconds": 60}},
+}
+
+#------------------------------------#
+# Dispatch
+#------------------------------------#
+def test_main_routes_alternative_helper(load_main):
+    main = load_main(ROUTES)
+    res = main.main(request("+15550001111", body=" Hello "))
+    assert (res.body, res.status_code) == ("reply from alternative_helper", 200)
+    backend = sys.modules["__app__.alternative_helper"]
+    assert backend.CALLS == [((), {
+        "PIN": "1234",
+        "incoming_message": "hello",
+        "send_to": "+15551230000",
+        "send_from": "+15550001111",
+        "system_prompt": "Be brief.",
+    })]
+
+def test_main_routes_onsite_helper_with_media(load_main):
+    main = load_main(ROUTES)
+    res = main.main(request("+15550002222", NumMedia="3",
+                            MediaContentType0="image/jpeg", MediaUrl0="https://img",
+                            MediaContentType1="audio/ogg", MediaUrl1="https://audio",
+                            MediaContentType2="video/mp4", MediaUrl2="https://video"))
+    assert (res.body, res.status_code) == ("reply from onsite_helper", 200)
+    backend = sys.modules["__app__.onsite_helper"]
+    assert backend.CALLS == [((), {
+        "PIN": "5678",
+        "incoming_message": "hello",
+        "send_to": "+15551230000",
+        "send_from": "+15550002222",
+        "image_urls": ["https://img"],
+        "audio_urls": ["https://audio"],
+        "queue_endpoint": "https://sqs",
+    })]
+
+def test_main_routes_helper(load_main):
+    main = load_main(ROUTES)
+    res = main.main(request("+15550003333"))
+    assert res.status_code == 200
+    backend = sys.modules["__app__.helper"]
+    assert backend.CALLS == [(("abcd", "+15551230000", "+15550003333", "hello"), {"tools": []})]
+
+def test_main_unknown_number(load_main):
+    main = load_main(ROUTES)
+    res = main.main(request("+15559999999"))
+    assert (res.body, res.status_code) == ("", 404)
+
+def test_main_catch_all(load_main):
+    main = load_main({"*": {"backend": "alternative_helper", "pin": "1234"}})
+    res = main.main(request("+15559999999"))
+    assert res.body == "reply from alternative_helper"
+
+def test_main_rate_limited_sends_no_reply(load_main):
+    main = load_main(ROUTES)
+    main.main(request("+15550003333"))
+    res = main.main(request("+15550003333"))
+    assert (res.body, res.status_code) == ("", 200)
+    assert len(sys.modules["__app__.helper"].CALLS) == 1
@@ -0,0 +1,167 @@
+import sys
+import json
+import threading
+import pytest
+
+#------------------------------------#
+# load_routes
+#------------------------------------#
+def test_load_routes_imports_only_used_backends(router):
+    routes = router.load_routes(json.dumps({
+        "+15550001111": {"backend": "alternative_helper", "pin": "1234"},
+        "+15550002222": {"backend": "alternative_helper", "pin": "5678"},
+    }))
+    assert routes["+15550001111"]["module"].NAME == "alternative_helper"
+    assert routes["+15550001111"]["module"] is routes["+15550002222"]["module"]
+    assert "__app__.helper" not in sys.modules
+    assert "__app__.onsite_helper" not in sys.modules
+
+def test_load_routes_defaults_to_single_catch_all(router, monkeypatch):
+    monkeypatch.setenv("SECURITY_PIN", "1234")
+    monkeypatch.setenv("SMS_BACKEND", "helper")
+    routes = router.load_routes()
+    assert list(routes) == ["*"]
+    assert routes["*"]["backend"] == "helper"
+    assert routes["*"]["pin"] == "1234"
+
+def test_load_routes_reads_sms_routes(router, monkeypatch):
+    monkeypatch.setenv("SMS_ROUTES", json.dumps({"+15550001111": {"backend": "helper", "pin": "1234"}}))
+    assert list(router.load_routes()) == ["+15550001111"]
+
+@pytest.mark.parametrize("raw_routes", ["not json", "[]", "{}"])
+def test_load_routes_rejects_bad_table(router, raw_routes):
+    with pytest.raises(ValueError):
+        router.load_routes(raw_routes)
+
+#------------------------------------#
+# validate_route
+#------------------------------------#
+def test_validate_route_keeps_backend_settings(router):
+    route = router.validate_route("+15550001111", {
+        "backend": "alternative_helper",
+        "pin": "1234",
+        "tools": [],
+        "system_prompt": "Be brief.",
+        "rate_limit": {"messages": 5, "seconds": 60},
+    })
+    assert route["backend"] == "alternative_helper"
+    assert route["pin"] == "1234"
+    assert route["rate_limit"] == {"messages": 5, "seconds": 60}
+    assert route["settings"] == {"tools": [], "system_prompt": "Be brief."}
+
+def test_validate_route_pin_falls_back_to_env(router, monkeypatch):
+    monkeypatch.setenv("SECURITY_PIN", "1234")
+    assert router.validate_route("*", {"backend": "helper"})["pin"] == "1234"
+
+def test_validate_route_normalizes_pin(router, monkeypatch):
+    # Incoming messages are stripped & lowercased, so the PIN must be too
+    monkeypatch.setenv("SECURITY_PIN", " AbC ")
+    assert router.validate_route("*", {"backend": "helper"})["pin"] == "abc"
+
+@pytest.mark.parametrize("number, route_config", [
+    ("5550001111", {"backend": "helper", "pin": "1234"}),
+    ("+15550001111", "helper"),
+    ("+15550001111", {"backend": "unknown", "pin": "1234"}),
+    ("+15550001111", {"backend": ["helper"], "pin": "1234"}),
+    ("+15550001111", {"backend": "helper"}),
+    ("+15550001111", {"backend": "helper", "pin": 1234}),
+    ("+15550001111", {"backend": "helper", "pin": "  "}),
+    ("+15550001111", {"backend": "helper", "pin": "1234", "queue_endpoint": "https://sqs"}),
+    ("+15550001111", {"backend": "helper", "pin": "1234", "tools": ["unknown"]}),
+    ("+15550001111", {"backend": "helper", "pin": "1234", "tools": [[1]]}),
+    ("+15550001111", {"backend": "helper", "pin": "1234", "tools": "schedule_reminder"}),
+    ("+15550001111", {"backend": "helper", "pin": "1234", "system_prompt": 5}),
+    ("+15550001111", {"backend": "helper", "pin": "1234", "welcome_message": ["hi"]}),
+    ("+15550001111", {"backend": "onsite_helper", "pin": "1234"}),
+    ("+15550001111", {"backend": "helper", "pin": "1234", "rate_limit": {"messages": True, "seconds": 60}}),
+    ("+15550001111", {"backend": "helper", "pin": "1234", "rate_limit": {"messages": 5, "seconds": 0}}),
+    ("+15550001111", {"backend": "helper", "pin": "1234", "rate_limit": 5}),
+])
+def test_validate_route_rejects_bad_route(router, number, route_config):
+    with pytest.raises(ValueError):
+        router.validate_route(number, route_config)
+
+def test_validate_route_onsite_queue_from_env(router, monkeypatch):
+    monkeypatch.setenv("AMAZON_QUEUE_ENDPOINT", "https://sqs")
+    route = router.validate_route("+15550001111", {"backend": "onsite_helper", "pin": "1234"})
+    assert route["settings"] == {}
+
+#------------------------------------#
+# get_route
+#------------------------------------#
+def test_get_route_exact_then_catch_all(router):
+    routes = router.load_routes(json.dumps({
+        "+15550001111": {"backend": "alternative_helper", "pin": "1234"},
+        "*": {"backend": "helper", "pin": "5678"},
+    }))
+    assert router.get_route(routes, "+15550001111")["backend"] == "alternative_helper"
+    assert router.get_route(routes, "+15559999999")["backend"] == "helper"
+
+def test_get_route_without_catch_all(router):
+    routes = router.load_routes(json.dumps({"+15550001111": {"backend": "helper", "pin": "1234"}}))
+    assert router.get_route(routes, "+15559999999") is None
+
+#------------------------------------#
+# is_rate_limited
+#------------------------------------#
+def test_is_rate_limited_without_limit(router):
+    route = router.validate_route("*", {"backend": "helper", "pin": "1234"})
+    assert not any(router.is_rate_limited(route, "+15551230000", "+15550001111") for _ in range(100))
+
+def test_is_rate_limited_window(router, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(router.time, "monotonic", lambda: now[0])
+    route = router.validate_route("*", {"backend": "helper", "pin": "1234",
+                                        "rate_limit": {"messages": 2, "seconds": 60}})
+    sender, number = "+15551230000", "+15550001111"
+    assert not router.is_rate_limited(route, sender, number)
+    assert not router.is_rate_limited(route, sender, number)
+    assert router.is_rate_limited(route, sender, number)
+    # Other senders have their own window
+    assert not router.is_rate_limited(route, "+15551239999", number)
+    now[0] += 61
+    assert not router.is_rate_limited(route, sender, number)
+
+def test_is_rate_limited_forgets_idle_senders(router, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(router.time, "monotonic", lambda: now[0])
+    route = router.validate_route("*", {"backend": "helper", "pin": "1234",
+                                        "rate_limit": {"messages": 2, "seconds": 60}})
+    for i in range(10):
+        router.is_rate_limited(route, f"+1555123000{i}", "+15550001111")
+    assert len(router._recent_messages) == 10
+    now[0] += router.PRUNE_INTERVAL + 1
+    router.is_rate_limited(route, "+15551239999", "+15550001111")
+    assert list(router._recent_messages) == [("+15550001111", "+15551239999")]
+
+def test_is_rate_limited_serializes_callers(router, monkeypatch):
+    # Hold the first caller inside is_rate_limited (while it prunes & trims)
+    # and check a second caller cannot get in until it is done.
+    entered = threading.Event()
+    release = threading.Event()
+
+    def monotonic():
+        if threading.current_thread().name == "first":
+            entered.set()
+            release.wait(5)
+        return 1000.0
+
+    monkeypatch.setattr(router.time, "monotonic", monotonic)
+    route = router.validate_route("*", {"backend": "helper", "pin": "1234",
+                                        "rate_limit": {"messages": 1, "seconds": 60}})
+    results = {}
+
+    def send(name):
+        results[name] = router.is_rate_limited(route, "+15551230000", "+15550001111")
+
+    first = threading.Thread(target=send, args=("first",), name="first")
+    second = threading.Thread(target=send, args=("second",))
+    first.start()
+    assert entered.wait(5)
+    second.start()
+    second.join(0.2)
+    assert second.is_alive()
+    release.set()
+    first.join(5)
+    second.join(5)
+    assert results == {"first": False, "second": True}